@@ -0,0 +1,317 @@
+# batch_pipeline.py - Memory-bounded streaming pipeline for batch grading
+#
+#   ingest -> decode/preprocess -> crop/encode -> extract -> score -> write
+#
+# Every stage runs on its own worker threads (cv2 releases the GIL and the Gemini
+# calls are network-bound) and stages are connected by bounded queues. A stage that
+# gets ahead blocks on its output queue instead of piling decoded images or PNG
+# payloads up in memory, so peak memory is set by the queue sizes and worker counts,
+# not by the number of sheets. A decoded sheet is dropped as soon as its regions are
+# encoded, and each PNG crop as soon as it has been uploaded for extraction.
+import logging
+import os
+import queue
+import threading
+import time
+
+from evaluation_system import (
+    build_student_result,
+    encode_region_png,
+    extract_answer_from_png,
+    get_client,
+    list_answer_sheets,
+    load_template,
+    prepare_evaluator,
+    preprocess_image,
+    write_student_result,
+    write_summaries,
+)
+
+logger = logging.getLogger(__name__)
+
+# End-of-stream marker passed down the queues
+_STOP = object()
+
+
+class MeteredQueue(queue.Queue):
+    """Bounded queue that tracks its current depth, high-water mark and throughput."""
+
+    def __init__(self, name, maxsize):
+        super().__init__(maxsize)
+        self.name = name
+        self.high_water = 0
+        self.total = 0
+
+    def _put(self, item):
+        # Called by Queue.put with the queue mutex held
+        super()._put(item)
+        if item is not _STOP:
+            self.total += 1
+        self.high_water = max(self.high_water, len(self.queue))
+
+    def metrics(self):
+        with self.mutex:
+            return {
+                "depth": sum(1 for item in self.queue if item is not _STOP),
+                "capacity": self.maxsize,
+                "high_water": self.high_water,
+                "total": self.total
+            }
+
+
+class _WorkItem:
+    """
+    One unit of work flowing through the pipeline. `count` is the number of template
+    regions the item stands for (all of them before the crop stage, one after it), so
+    the writer knows when a student is complete even if some items failed.
+    """
+    __slots__ = ("student_id", "img_path", "index", "count", "payload", "error")
+
+    def __init__(self, student_id, img_path, index=None, count=1, payload=None, error=None):
+        self.student_id = student_id
+        self.img_path = img_path
+        self.index = index
+        self.count = count
+        self.payload = payload
+        self.error = error
+
+
+class _Stage:
+    """A pool of worker threads applying `func` (a generator) from in_queue to out_queue."""
+
+    def __init__(self, name, func, workers, in_queue, out_queue):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.processed = 0
+        self.busy = 0
+        self._alive = 0
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        self._alive = self.workers
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self):
+        while True:
+            item = self.in_queue.get()
+            if item is _STOP:
+                # Let the sibling workers see the marker too
+                self.in_queue.put(_STOP)
+                break
+            if item.error is not None:
+                self.out_queue.put(item)
+                continue
+
+            with self._lock:
+                self.busy += 1
+            emitted = 0
+            try:
+                for out in self.func(item):
+                    emitted += out.count
+                    self.out_queue.put(out) # blocks while downstream is full (backpressure)
+            except Exception as e:
+                logger.error(f"{self.name} failed for {item.student_id}: {e}")
+                # Account for the regions this item would still have produced
+                self.out_queue.put(_WorkItem(item.student_id, item.img_path, item.index,
+                                             count=item.count - emitted, error=e))
+            finally:
+                with self._lock:
+                    self.busy -= 1
+                    self.processed += 1
+
+        with self._lock:
+            self._alive -= 1
+            last = self._alive == 0
+        if last:
+            self.out_queue.put(_STOP)
+
+    def metrics(self):
+        with self._lock:
+            return {"workers": self.workers, "busy": self.busy, "processed": self.processed}
+
+
+class StreamingBatchPipeline:
+    """
+    Grades answer sheets through bounded, concurrently running stages.
+
+    Concurrency is set per stage (`decode_workers`, `encode_workers`,
+    `extract_workers`, `score_workers`); the extract and score pools should be large
+    enough to keep the API saturated. `max_decoded` bounds how many full-resolution
+    sheets wait between decode and crop, `max_crops` how many encoded PNG crops wait
+    for upload, and `max_pending` the other queues. metrics() can be polled at any
+    time; with `metrics_interval` the queue depths are also logged periodically.
+    """
+
+    def __init__(self, evaluator, output_dir, decode_workers=2, encode_workers=2, extract_workers=8,
+                 score_workers=8, max_decoded=4, max_crops=32, max_pending=64, metrics_interval=None):
+        self.evaluator = evaluator
+        self.output_dir = output_dir
+        self.metrics_interval = metrics_interval
+        self.regions = evaluator.template_regions
+
+        self.queues = {
+            "ingest": MeteredQueue("ingest", max(2, decode_workers * 2)),
+            "decoded": MeteredQueue("decoded", max_decoded),
+            "crops": MeteredQueue("crops", max_crops),
+            "answers": MeteredQueue("answers", max_pending),
+            "scored": MeteredQueue("scored", max_pending),
+        }
+        self.stages = [
+            _Stage("decode", self._decode, decode_workers, self.queues["ingest"], self.queues["decoded"]),
+            _Stage("encode", self._encode, encode_workers, self.queues["decoded"], self.queues["crops"]),
+            _Stage("extract", self._extract, extract_workers, self.queues["crops"], self.queues["answers"]),
+            _Stage("score", self._score, score_workers, self.queues["answers"], self.queues["scored"]),
+        ]
+
+        self.results = []
+        self.failed = []
+        self._pending = {} # student_id -> [details, regions received, first error]
+        self._done = threading.Event()
+
+    # --- Stage functions ---
+
+    def _decode(self, item):
+        item.payload, _ = preprocess_image(item.img_path)
+        yield item
+
+    def _encode(self, item):
+        img = item.payload
+        item.payload = None
+        for index, region in enumerate(self.regions):
+            yield _WorkItem(item.student_id, item.img_path, index, payload=encode_region_png(img, region['answer_bbox']))
+
+    def _extract(self, item):
+        region = self.regions[item.index]
+        # Replacing the payload drops the PNG buffer once it has been uploaded
+        item.payload = extract_answer_from_png(item.payload, region['q_no'], region['type'])
+        yield item
+
+    def _score(self, item):
+        item.payload = self.evaluator.score_answer(item.index, item.payload)
+        yield item
+
+    # --- Ingest / write ---
+
+    def _ingest(self, sheets):
+        for student_id, img_path in sheets.items():
+            self.queues["ingest"].put(_WorkItem(student_id, img_path, count=len(self.regions)))
+        self.queues["ingest"].put(_STOP)
+
+    def _write(self):
+        scored = self.queues["scored"]
+        while True:
+            item = scored.get()
+            if item is _STOP:
+                break
+            state = self._pending.setdefault(item.student_id, [[None] * len(self.regions), 0, None])
+            if item.error is not None:
+                state[2] = state[2] or item.error
+            else:
+                state[0][item.index] = item.payload
+            state[1] += item.count
+            if state[1] < len(self.regions):
+                continue
+
+            details, _, error = self._pending.pop(item.student_id)
+            if error is not None:
+                logger.error(f"Error processing {os.path.basename(item.img_path)}: {error}")
+                self.failed.append(item.student_id)
+                continue
+            try:
+                result = build_student_result(item.student_id, details, len(self.regions))
+                write_student_result(self.output_dir, result)
+                self.results.append(result)
+            except Exception as e:
+                logger.error(f"Error writing result for {item.student_id}: {e}")
+                self.failed.append(item.student_id)
+
+    def _monitor(self):
+        while not self._done.wait(self.metrics_interval):
+            depths = ", ".join(f"{name}={m['depth']}/{m['capacity']}" for name, m in self.metrics()["queues"].items())
+            logger.info(f"Pipeline queues: {depths}; written={len(self.results)}")
+
+    # --- Public API ---
+
+    def metrics(self):
+        """Snapshot of queue depths/high-water marks, per-stage activity and progress."""
+        return {
+            "queues": {name: q.metrics() for name, q in self.queues.items()},
+            "stages": {stage.name: stage.metrics() for stage in self.stages},
+            "students_written": len(self.results),
+            "students_failed": len(self.failed),
+            "students_in_flight": len(self._pending)
+        }
+
+    def run(self, sheets):
+        """Grades `sheets` ({student_id: image path}), returning the per-student results in input order."""
+        if not self.regions:
+            # Nothing flows past the encode stage for an empty template; write the
+            # 0/0 results directly, as process_batch does
+            logger.warning("Template has no regions; writing empty results.")
+            for student_id in sheets:
+                result = build_student_result(student_id, [], 0)
+                write_student_result(self.output_dir, result)
+                self.results.append(result)
+            return self.results
+
+        start = time.perf_counter()
+        # Create the shared Gemini client once, before the extract/score workers start
+        if get_client() is None:
+            logger.warning("Gemini Client is not available; items will be recorded as scoring failures "
+                           "and can be re-graded later with `failed=True`.")
+        for stage in self.stages:
+            stage.start()
+        ingest = threading.Thread(target=self._ingest, args=(sheets,), name="ingest", daemon=True)
+        writer = threading.Thread(target=self._write, name="write", daemon=True)
+        ingest.start()
+        writer.start()
+        if self.metrics_interval:
+            threading.Thread(target=self._monitor, name="metrics", daemon=True).start()
+
+        ingest.join()
+        for stage in self.stages:
+            stage.join()
+        writer.join()
+        self._done.set()
+
+        logger.info(f"Pipeline finished {len(self.results)} sheet(s) ({len(self.failed)} failed) "
+                    f"in {time.perf_counter() - start:.1f}s; queue high-water marks: "
+                    + ", ".join(f"{name}={q.high_water}/{q.maxsize}" for name, q in self.queues.items()))
+
+        order = {student_id: i for i, student_id in enumerate(sheets)}
+        self.results.sort(key=lambda result: order[result['student_id']])
+        return self.results
+
+
+def process_batch_streaming(question_paper_img, answer_key_img, answer_sheet_dir, template_json, output_dir="results",
+                            ocr_engine=None, **pipeline_options):
+    """
+    Same inputs and outputs as evaluation_system.process_batch, but the sheets are
+    graded concurrently through a StreamingBatchPipeline (`pipeline_options` are
+    passed to it). Returns the pipeline metrics.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(answer_sheet_dir, exist_ok=True)
+
+    template = load_template(question_paper_img, template_json)
+
+    evaluator = prepare_evaluator(question_paper_img, answer_key_img, template['regions'], ocr_engine)
+
+    pipeline = StreamingBatchPipeline(evaluator, output_dir, **pipeline_options)
+    results = pipeline.run(list_answer_sheets(answer_sheet_dir))
+
+    write_summaries(output_dir, results)
+
+    logger.info(f"Evaluation complete. Results saved in '{output_dir}'")
+    return pipeline.metrics()
@@ -0,0 +1,231 @@
+# run_evaluation.py - Command-line entry point for the evaluation backends
+#
+#   python run_evaluation.py batch  --question-paper data/1.jpg --answer-key data/answer_key.jpg ...
+#   python run_evaluation.py batch --streaming --extract-workers 16 --score-workers 16 ...
+#   python run_evaluation.py regrade --q-no 3 --failed --min-confidence 0.6 ...
+#   python run_evaluation.py grade  --key-page data/answer_key.jpg --student-page data/answer_sheets/Answer_sheet.jpg
+#   python run_evaluation.py startup-time
+#
+# The library modules are imported inside each command so that `--help` and the
+# startup benchmark do not pay for them.
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DEFAULT_QUESTION_PAPER = "C:/Evaluation/data/1.jpg"
+DEFAULT_ANSWER_KEY = "C:/Evaluation/data/answer_key.jpg"
+DEFAULT_ANSWER_SHEETS_DIR = "C:/Evaluation/data/answer_sheets"
+DEFAULT_TEMPLATE_JSON = "data/template.json"
+DEFAULT_OUTPUT_DIR = "results/"
+DEFAULT_STUDENT_PAGE = "C:/Evaluation/data/answer_sheets/Answer_sheet.jpg"
+DEFAULT_REPORT = "evaluation_report_student_1.json"
+
+
+def _configure_client(module, api_key):
+    if api_key:
+        module.configure_client(api_key=api_key)
+
+
+def run_batch(args):
+    """Template-driven batch grading (evaluation_system.process_batch)."""
+    import evaluation_system
+
+    _configure_client(evaluation_system, args.api_key)
+    batch_kwargs = dict(
+        question_paper_img=args.question_paper,
+        answer_key_img=args.answer_key,
+        answer_sheet_dir=args.answer_sheets,
+        template_json=args.template,
+        output_dir=args.output_dir
+    )
+    with evaluation_system.BatchOCREngine(max_workers=args.ocr_workers, cache_dir=args.ocr_cache_dir) as ocr_engine:
+        if not args.streaming:
+            evaluation_system.process_batch(ocr_engine=ocr_engine, **batch_kwargs)
+            return
+
+        from batch_pipeline import process_batch_streaming
+
+        metrics = process_batch_streaming(
+            ocr_engine=ocr_engine,
+            decode_workers=args.decode_workers,
+            encode_workers=args.encode_workers,
+            extract_workers=args.extract_workers,
+            score_workers=args.score_workers,
+            max_decoded=args.max_decoded,
+            max_crops=args.max_crops,
+            metrics_interval=args.metrics_interval,
+            **batch_kwargs
+        )
+        print(json.dumps(metrics, indent=2))
+
+
+def run_regrade(args):
+    """Selective re-grading of an existing batch run (evaluation_system.regrade_batch)."""
+    import evaluation_system
+
+    _configure_client(evaluation_system, args.api_key)
+    with evaluation_system.BatchOCREngine(max_workers=args.ocr_workers, cache_dir=args.ocr_cache_dir) as ocr_engine:
+        regraded = evaluation_system.regrade_batch(
+            question_paper_img=args.question_paper,
+            answer_key_img=args.answer_key,
+            answer_sheet_dir=args.answer_sheets,
+            template_json=args.template,
+            output_dir=args.output_dir,
+            q_nos=args.q_no,
+            flagged=args.flagged,
+            failed=args.failed,
+            min_confidence=args.min_confidence,
+            max_workers=args.workers,
+            ocr_engine=ocr_engine
+        )
+    print(f"Re-graded {sum(len(q) for q in regraded.values())} item(s) for {len(regraded)} student(s).")
+
+
+def run_grade(args):
+    """Whole-sheet grading of one student (enhanced_evaluation_system)."""
+    import enhanced_evaluation_system
+
+    _configure_client(enhanced_evaluation_system, args.api_key)
+    key_pages = args.key_page or [DEFAULT_ANSWER_KEY]
+    student_pages = args.student_page or [DEFAULT_STUDENT_PAGE]
+
+    # Check if all files exist (critical for execution)
+    for p in key_pages + student_pages:
+        if not os.path.exists(p):
+            print(f"⚠️ Warning: File not found at '{p}'.")
+
+    final_evaluation = enhanced_evaluation_system.auto_grade_student_sheet(
+        key_pages=key_pages,
+        student_pages=student_pages
+    )
+
+    print("\n" + "="*80)
+    print("📚 FINAL MULTILINGUAL EVALUATION REPORT (Structured JSON Output)")
+    print("="*80)
+    print(json.dumps(final_evaluation, indent=2))
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(final_evaluation, f, indent=2, ensure_ascii=False) # ensure_ascii=False handles non-English characters
+
+    print(f"\n✅ Evaluation saved to {args.output}")
+
+
+class StartupImportError(RuntimeError):
+    """Raised by measure_startup_time when one of the modules fails to import."""
+
+    def __init__(self, module, error):
+        super().__init__(f"import {module} failed: {error}")
+        self.module = module
+        self.error = error
+
+
+def measure_startup_time(modules, runs=5):
+    """
+    Measures the cold-start cost of importing `modules` in fresh interpreters,
+    which is what every worker process pays before it can take work.
+    Returns the per-run wall-clock times in milliseconds.
+    Raises StartupImportError naming the module that could not be imported.
+    """
+    code = "import " + ", ".join(modules)
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", code], cwd=backend_dir, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise _find_failing_import(modules, backend_dir)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _find_failing_import(modules, backend_dir):
+    # Import the modules one by one to report which of them is broken
+    for module in modules:
+        proc = subprocess.run([sys.executable, "-c", f"import {module}"], cwd=backend_dir,
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines()
+            return StartupImportError(module, lines[-1] if lines else f"exit code {proc.returncode}")
+    return StartupImportError(", ".join(modules), "failed when imported together")
+
+
+def run_startup_time(args):
+    try:
+        baseline = measure_startup_time(["sys"], args.runs)
+        timings = measure_startup_time(args.modules, args.runs)
+    except StartupImportError as e:
+        print(f"Cannot measure startup time: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Interpreter baseline: {statistics.median(baseline):.1f} ms (median of {args.runs})")
+    print(f"import {', '.join(args.modules)}: {statistics.median(timings):.1f} ms "
+          f"(+{statistics.median(timings) - statistics.median(baseline):.1f} ms)")
+
+
+def _add_batch_arguments(parser):
+    parser.add_argument("--question-paper", default=DEFAULT_QUESTION_PAPER)
+    parser.add_argument("--answer-key", default=DEFAULT_ANSWER_KEY)
+    parser.add_argument("--answer-sheets", default=DEFAULT_ANSWER_SHEETS_DIR)
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE_JSON)
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--ocr-workers", type=int, default=None,
+                        help="Tesseract worker processes for question/key OCR (default: CPU count)")
+    parser.add_argument("--ocr-cache-dir", default=os.environ.get("OCR_CACHE_DIR"),
+                        help="Directory for the persistent OCR cache (default: $OCR_CACHE_DIR, in-memory only if unset)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="SynthScore answer sheet evaluation")
+    parser.add_argument("--api-key", default=None,
+                        help="Gemini API key (defaults to the GEMINI_API_KEY / GOOGLE_API_KEY environment variables)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch = subparsers.add_parser("batch", help="Grade a directory of answer sheets against a template")
+    _add_batch_arguments(batch)
+    batch.add_argument("--streaming", action="store_true",
+                       help="Grade sheets concurrently through the memory-bounded staged pipeline")
+    batch.add_argument("--decode-workers", type=int, default=2)
+    batch.add_argument("--encode-workers", type=int, default=2)
+    batch.add_argument("--extract-workers", type=int, default=8, help="Concurrent Gemini Vision extraction calls")
+    batch.add_argument("--score-workers", type=int, default=8, help="Concurrent Gemini scoring calls")
+    batch.add_argument("--max-decoded", type=int, default=4, help="Decoded sheets allowed to wait for cropping")
+    batch.add_argument("--max-crops", type=int, default=32, help="Encoded crops allowed to wait for upload")
+    batch.add_argument("--metrics-interval", type=float, default=None,
+                       help="Log pipeline queue depths every N seconds")
+    batch.set_defaults(func=run_batch)
+
+    regrade = subparsers.add_parser("regrade", help="Re-grade only selected items of an existing batch run")
+    _add_batch_arguments(regrade)
+    regrade.add_argument("--q-no", type=int, action="append", help="Re-grade this question for every student (repeatable)")
+    regrade.add_argument("--flagged", action="store_true", help="Re-grade items Gemini flagged for review (illegible or ambiguous answers)")
+    regrade.add_argument("--failed", action="store_true", help="Re-grade items whose Gemini scoring failed")
+    regrade.add_argument("--min-confidence", type=float, default=None,
+                         help="Re-grade items scored with a confidence below this value")
+    regrade.add_argument("--workers", type=int, default=8, help="Students re-graded concurrently")
+    regrade.set_defaults(func=run_regrade)
+
+    grade = subparsers.add_parser("grade", help="Grade one (multi-page) student sheet against image key pages")
+    grade.add_argument("--key-page", action="append", help="Answer key page image (repeatable)")
+    grade.add_argument("--student-page", action="append", help="Student answer page image (repeatable)")
+    grade.add_argument("--output", default=DEFAULT_REPORT)
+    grade.set_defaults(func=run_grade)
+
+    startup = subparsers.add_parser("startup-time", help="Measure worker cold-start import time")
+    startup.add_argument("--runs", type=int, default=5)
+    startup.add_argument("--modules", nargs="+", default=["evaluation_system", "enhanced_evaluation_system", "batch_pipeline"])
+    startup.set_defaults(func=run_startup_time)
+    return parser
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# Shared fixtures for the backend tests.
+#
+# The Gemini SDK is replaced by a small in-memory fake so the tests exercise the
+# real client initialization and threading paths without network access.
+import json
+import os
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import evaluation_system  # noqa: E402
+
+
+class FakeModels:
+    def __init__(self, client):
+        self.client = client
+
+    def generate_content(self, model, contents, config=None):
+        with self.client.lock:
+            self.client.calls += 1
+        if config is None:
+            # Answer extraction (vision) call
+            return types.SimpleNamespace(text=self.client.answer)
+        # Semantic scoring call (structured JSON output)
+        return types.SimpleNamespace(text=json.dumps(self.client.score_response))
+
+
+class FakeClient:
+    """Stand-in for genai.Client whose construction is slow, to widen init races."""
+    init_delay = 0.2
+    instances = []
+    fail = False
+
+    def __init__(self, **kwargs):
+        time.sleep(self.init_delay)
+        if FakeClient.fail:
+            raise RuntimeError("invalid API key")
+        self.kwargs = kwargs
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.answer = "A"
+        self.score_response = {"score": 1, "reason": "Correct.", "confidence": 0.9, "flag_for_review": False}
+        self.models = FakeModels(self)
+        FakeClient.instances.append(self)
+
+
+class _Anything:
+    """Accepts any constructor arguments / attribute access (types.Schema, types.Type, ...)."""
+
+    def __init__(self, *args, **kwargs):
+        self.kwargs = kwargs
+
+    def __getattr__(self, name):
+        return name
+
+
+@pytest.fixture
+def fake_genai(monkeypatch):
+    """Installs a fake google.genai package and resets the lazily created client."""
+    genai_types = types.ModuleType("google.genai.types")
+    genai_types.Part = types.SimpleNamespace(from_bytes=lambda data, mime_type: ("part", data))
+    genai_types.GenerateContentConfig = _Anything
+    genai_types.Schema = _Anything
+    genai_types.Type = _Anything()
+
+    genai = types.ModuleType("google.genai")
+    genai.Client = FakeClient
+    genai.types = genai_types
+    google = types.ModuleType("google")
+    google.genai = genai
+
+    monkeypatch.setitem(sys.modules, "google", google)
+    monkeypatch.setitem(sys.modules, "google.genai", genai)
+    monkeypatch.setitem(sys.modules, "google.genai.types", genai_types)
+    monkeypatch.setattr(FakeClient, "instances", [])
+    monkeypatch.setattr(FakeClient, "fail", False)
+
+    evaluation_system.configure_client()
+    yield FakeClient
+    evaluation_system.configure_client()
+
+
+class FakeOCREngine:
+    """OCR engine returning readable question text and a valid key for every region."""
+
+    def ocr_many(self, requests):
+        return ["Which option is correct? Key: A" for _ in requests]
+
+
+@pytest.fixture
+def exam(tmp_path, monkeypatch):
+    """A template, answer sheet files and an evaluator setup that needs no image libraries."""
+    monkeypatch.setattr(evaluation_system, "preprocess_image", lambda path: (path, path))
+    monkeypatch.setattr(evaluation_system, "image_to_base64_part", lambda path, bbox: ("part", path, tuple(bbox)))
+
+    template_json = str(tmp_path / "template.json")
+    evaluation_system.generate_template_json("question.jpg", template_json)
+    sheets_dir = tmp_path / "sheets"
+    sheets_dir.mkdir()
+    for i in range(8):
+        (sheets_dir / f"student_{i}.jpg").write_bytes(b"")
+    output_dir = tmp_path / "results"
+    output_dir.mkdir()
+
+    return types.SimpleNamespace(
+        template_json=template_json,
+        sheets_dir=str(sheets_dir),
+        output_dir=str(output_dir),
+        ocr_engine=FakeOCREngine(),
+        regions=json.load(open(template_json))["regions"],
+    )
@@ -0,0 +1,119 @@
+import json
+import os
+import time
+import weakref
+
+import batch_pipeline
+import evaluation_system
+
+
+def test_streaming_pipeline_grades_sheets_concurrently(fake_genai, exam, monkeypatch):
+    monkeypatch.setattr(batch_pipeline, "preprocess_image", lambda path: (path, path))
+    monkeypatch.setattr(batch_pipeline, "encode_region_png", lambda img, bbox: f"{img}:{bbox}".encode())
+
+    metrics = batch_pipeline.process_batch_streaming(
+        "question.jpg", "key.jpg", exam.sheets_dir, exam.template_json, exam.output_dir,
+        ocr_engine=exam.ocr_engine, extract_workers=8, score_workers=8, max_crops=4, max_pending=4
+    )
+
+    assert len(fake_genai.instances) == 1
+    assert metrics["students_written"] == 8
+    assert metrics["students_failed"] == 0
+    for queue_metrics in metrics["queues"].values():
+        assert queue_metrics["depth"] == 0
+
+    summary = json.load(open(os.path.join(exam.output_dir, "summary.json")))
+    assert [result['student_id'] for result in summary] == [f"student_{i}" for i in range(8)]
+    for result in summary:
+        assert result['total_score'] == "7/7"
+        assert [d['q_no'] for d in result['details']] == [r['q_no'] for r in exam.regions]
+        assert all(d['student_answer'] == "A" for d in result['details'])
+        assert os.path.exists(os.path.join(exam.output_dir, f"{result['student_id']}.json"))
+
+
+def test_streaming_pipeline_skips_sheets_that_fail_to_decode(fake_genai, exam, monkeypatch):
+    def preprocess(path):
+        if path.endswith("student_3.jpg"):
+            raise FileNotFoundError(path)
+        return path, path
+
+    monkeypatch.setattr(batch_pipeline, "preprocess_image", preprocess)
+    monkeypatch.setattr(batch_pipeline, "encode_region_png", lambda img, bbox: b"png")
+
+    metrics = batch_pipeline.process_batch_streaming(
+        "question.jpg", "key.jpg", exam.sheets_dir, exam.template_json, exam.output_dir,
+        ocr_engine=exam.ocr_engine
+    )
+
+    assert metrics["students_written"] == 7
+    assert metrics["students_failed"] == 1
+    assert not os.path.exists(os.path.join(exam.output_dir, "student_3.json"))
+
+
+class _Sheet:
+    """Stand-in for a decoded image; weak-referenceable so liveness can be tracked."""
+
+
+class _Crop:
+    """Stand-in for an encoded PNG crop."""
+
+
+def test_streaming_pipeline_bounds_live_images_and_crops(fake_genai, exam, monkeypatch):
+    decoded, crops = weakref.WeakSet(), weakref.WeakSet()
+    decoded_alive, crops_alive = [], []
+
+    def preprocess(path):
+        decoded_alive.append(len(decoded))
+        sheet = _Sheet()
+        decoded.add(sheet)
+        return sheet, sheet
+
+    def encode(img, bbox):
+        crops_alive.append(len(crops))
+        crop = _Crop()
+        crops.add(crop)
+        return crop
+
+    score_answer = evaluation_system.AnswerSheetEvaluator.score_answer
+
+    def slow_score_answer(self, index, answer):
+        time.sleep(0.005)
+        return score_answer(self, index, answer)
+
+    monkeypatch.setattr(batch_pipeline, "preprocess_image", preprocess)
+    monkeypatch.setattr(batch_pipeline, "encode_region_png", encode)
+    monkeypatch.setattr(evaluation_system.AnswerSheetEvaluator, "score_answer", slow_score_answer)
+    options = dict(decode_workers=1, encode_workers=1, extract_workers=2, score_workers=1,
+                   max_decoded=2, max_crops=3, max_pending=2)
+
+    metrics = batch_pipeline.process_batch_streaming(
+        "question.jpg", "key.jpg", exam.sheets_dir, exam.template_json, exam.output_dir,
+        ocr_engine=exam.ocr_engine, **options
+    )
+
+    assert metrics["students_written"] == 8
+    # Decoded sheets can only be held by decode workers, the decoded queue and encode workers
+    decoded_bound = options["decode_workers"] + options["max_decoded"] + options["encode_workers"]
+    assert max(decoded_alive) <= decoded_bound < 8
+    # Crops can only be held by encode workers, the crops queue and in-flight extract calls
+    crops_bound = options["encode_workers"] + options["max_crops"] + options["extract_workers"]
+    assert max(crops_alive) <= crops_bound
+    # The score stage is the bottleneck, so the crops queue must have filled up (backpressure)
+    assert metrics["queues"]["crops"]["high_water"] == options["max_crops"]
+    # Everything is released once the run finishes
+    assert len(decoded) == 0 and len(crops) == 0
+
+
+def test_streaming_pipeline_writes_empty_results_for_empty_template(fake_genai, exam, monkeypatch):
+    with open(exam.template_json, 'w') as f:
+        json.dump({"template_name": "empty", "regions": []}, f)
+    monkeypatch.setattr(batch_pipeline, "preprocess_image", lambda path: (path, path))
+
+    metrics = batch_pipeline.process_batch_streaming(
+        "question.jpg", "key.jpg", exam.sheets_dir, exam.template_json, exam.output_dir,
+        ocr_engine=exam.ocr_engine
+    )
+
+    assert metrics["students_written"] == 8
+    summary = json.load(open(os.path.join(exam.output_dir, "summary.json")))
+    assert [result['total_score'] for result in summary] == ["0/0"] * 8
@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import evaluation_system
+import run_evaluation
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_has_no_heavy_dependencies():
+    code = ("import sys, evaluation_system, batch_pipeline; "
+            "print(sorted(m for m in ('cv2', 'PIL', 'numpy', 'google', 'pytesseract', 'langdetect') if m in sys.modules))")
+    proc = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+
+    assert proc.stdout.strip() == "[]"
+
+
+def test_get_client_concurrent_callers_share_one_client(fake_genai):
+    clients = []
+    barrier = threading.Barrier(8)
+
+    def call():
+        barrier.wait()
+        clients.append(evaluation_system.get_client())
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(fake_genai.instances) == 1
+    assert clients == [fake_genai.instances[0]] * 8
+
+
+def test_get_client_failure_returns_none_once(fake_genai):
+    fake_genai.fail = True
+
+    assert evaluation_system.get_client() is None
+    assert evaluation_system.get_client() is None
+    assert fake_genai.instances == []
+
+
+def test_startup_time_reports_failing_module():
+    with pytest.raises(run_evaluation.StartupImportError) as excinfo:
+        run_evaluation.measure_startup_time(["evaluation_system", "no_such_module_xyz"], runs=1)
+
+    assert excinfo.value.module == "no_such_module_xyz"
+    assert "No module named" in excinfo.value.error
+
+
+def test_startup_time_measures_importable_modules():
+    timings = run_evaluation.measure_startup_time(["evaluation_system"], runs=2)
+
+    assert len(timings) == 2
+    assert all(t > 0 for t in timings)
@@ -0,0 +1,158 @@
+import os
+import sys
+import threading
+import types
+
+import pytest
+
+import evaluation_system
+from evaluation_system import BatchOCREngine
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def fake_tesseract(monkeypatch):
+    """Stub pytesseract whose output is the crop's top-left pixel value, counting calls."""
+    module = types.ModuleType("pytesseract")
+    module.calls = []
+    module.TesseractNotFoundError = type("TesseractNotFoundError", (Exception,), {})
+    module.pytesseract = types.SimpleNamespace(tesseract_cmd="tesseract")
+
+    def image_to_string(image, config=""):
+        module.calls.append(config)
+        return f" T{int(image[0, 0])} \n"
+
+    module.image_to_string = image_to_string
+    monkeypatch.setitem(sys.modules, "pytesseract", module)
+    monkeypatch.setattr(evaluation_system, "_pytesseract", None)
+    return module
+
+
+def _striped_image(values, height=10, width=20):
+    """One horizontal stripe of `height` rows per value."""
+    return np.concatenate([np.full((height, width), v, np.uint8) for v in values])
+
+
+def test_cache_hit_skips_tesseract(fake_tesseract):
+    img = _striped_image([1, 2])
+    engine = BatchOCREngine(max_workers=1)
+
+    first = engine.ocr_regions(img, [[0, 0, 20, 10], [0, 10, 20, 20]])
+    second = engine.ocr_regions(img, [[0, 0, 20, 10], [0, 10, 20, 20]])
+
+    assert first == second == ["T1", "T2"]
+    assert len(fake_tesseract.calls) == 2
+
+
+def test_identical_crops_in_a_batch_are_scanned_once(fake_tesseract):
+    img = _striped_image([7, 7, 9])
+    engine = BatchOCREngine(max_workers=1)
+
+    texts = engine.ocr_regions(img, [[0, 0, 20, 10], [0, 10, 20, 20], [0, 20, 20, 30]])
+
+    assert texts == ["T7", "T7", "T9"]
+    assert len(fake_tesseract.calls) == 2
+
+
+def test_different_lang_is_a_different_cache_entry(fake_tesseract):
+    img = _striped_image([3])
+    engine = BatchOCREngine(max_workers=1)
+
+    engine.ocr_regions(img, [[0, 0, 20, 10]], lang='eng')
+    engine.ocr_regions(img, [[0, 0, 20, 10]], lang='hin')
+
+    assert len(fake_tesseract.calls) == 2
+
+
+def test_disk_cache_round_trip(fake_tesseract, tmp_path):
+    img = _striped_image([4, 5])
+    bboxes = [[0, 0, 20, 10], [0, 10, 20, 20]]
+
+    with BatchOCREngine(max_workers=1, cache_dir=str(tmp_path)) as engine:
+        first = engine.ocr_regions(img, bboxes)
+    with BatchOCREngine(max_workers=1, cache_dir=str(tmp_path)) as engine:
+        second = engine.ocr_regions(img, bboxes)
+
+    assert first == second == ["T4", "T5"]
+    assert len(fake_tesseract.calls) == 2
+    assert sorted(name.endswith(".txt") for name in os.listdir(tmp_path)) == [True, True]
+
+
+def test_memory_cache_is_bounded(fake_tesseract):
+    img = _striped_image([1, 2, 3])
+    engine = BatchOCREngine(max_workers=1, max_cache_entries=2)
+
+    engine.ocr_regions(img, [[0, 0, 20, 10], [0, 10, 20, 20], [0, 20, 20, 30]])
+
+    assert len(engine._cache) == 2
+
+
+def test_process_pool_keeps_request_order(fake_tesseract):
+    img = _striped_image([11, 12, 13, 14])
+    bboxes = [[0, 10 * i, 20, 10 * i + 10] for i in range(4)]
+
+    with BatchOCREngine(max_workers=2) as engine:
+        texts = engine.ocr_regions(img, bboxes)
+
+    assert texts == ["T11", "T12", "T13", "T14"]
+
+
+def test_question_and_key_order_with_missing_key_bboxes(fake_tesseract, fake_genai, monkeypatch):
+    images = {"question.jpg": _striped_image([1, 11, 21]), "key.jpg": _striped_image([101, 111, 121])}
+    monkeypatch.setattr(evaluation_system, "preprocess_image", lambda path: (images[path], images[path]))
+    regions = [
+        {"q_no": q_no, "type": "fillblank", "question_bbox": [0, 10 * i, 20, 10 * i + 10],
+         "answer_bbox": [0, 10 * i, 20, 10 * i + 10]}
+        for i, q_no in enumerate([1, 2, 3])
+    ]
+    regions[0]["key_bbox"] = regions[0]["question_bbox"]
+    regions[2]["key_bbox"] = regions[2]["question_bbox"]
+
+    evaluator = evaluation_system.AnswerSheetEvaluator(
+        "question.jpg", "key.jpg", regions, ocr_engine=BatchOCREngine(max_workers=1))
+    evaluator.extract_question_and_key()
+
+    assert evaluator.question_texts == ["T1", "T11", "T21"]
+    # Q2 has no key region, so its key is generated by Gemini (the fake answers "A")
+    assert evaluator.key_answers == ["T101", "A", "T121"]
+
+
+def test_shared_engine_is_created_once(monkeypatch):
+    monkeypatch.setattr(evaluation_system, "_ocr_engine", None)
+    engines = []
+    barrier = threading.Barrier(8)
+
+    def call():
+        barrier.wait()
+        engines.append(evaluation_system.get_ocr_engine())
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(engine) for engine in engines}) == 1
+
+
+def test_prepare_evaluator_closes_its_temporary_engine(fake_tesseract, monkeypatch):
+    images = {"question.jpg": _striped_image([1, 2]), "key.jpg": _striped_image([31, 32])}
+    monkeypatch.setattr(evaluation_system, "preprocess_image", lambda path: (images[path], images[path]))
+    closed = []
+
+    class TrackingEngine(BatchOCREngine):
+        def close(self):
+            closed.append(self)
+            super().close()
+
+    monkeypatch.setattr(evaluation_system, "BatchOCREngine", TrackingEngine)
+    regions = [{"q_no": i + 1, "type": "fillblank", "question_bbox": [0, 10 * i, 20, 10 * i + 10],
+                "key_bbox": [0, 10 * i, 20, 10 * i + 10], "answer_bbox": [0, 10 * i, 20, 10 * i + 10]}
+               for i in range(2)]
+
+    evaluator = evaluation_system.prepare_evaluator("question.jpg", "key.jpg", regions)
+
+    assert evaluator.key_answers == ["T31", "T32"]
+    assert closed == [evaluator.ocr_engine]
+    assert evaluator.ocr_engine._executor is None
@@ -0,0 +1,136 @@
+import json
+import os
+
+import evaluation_system
+from evaluation_system import SCORING_FAILED_REASON
+
+
+def _write_results(exam, failed_q_no):
+    """Writes a previous run where `failed_q_no` failed to score for every student."""
+    for i in range(8):
+        details = []
+        for region in exam.regions:
+            failed = region['q_no'] == failed_q_no
+            details.append({
+                "q_no": region['q_no'], "type": region['type'],
+                "student_answer": "ERROR: Gemini Client not available for answer extraction." if failed else "A",
+                "key_answer": "A", "score": 0 if failed else 1, "feedback": "",
+                "correct_answer": "A", "reason_for_wrong": SCORING_FAILED_REASON if failed else "N/A",
+                "confidence": None if failed else 0.9, "flag_for_review": False
+            })
+        result = evaluation_system.build_student_result(f"student_{i}", details, len(exam.regions))
+        evaluation_system.write_student_result(exam.output_dir, result)
+
+
+def test_regrade_students_concurrently_patches_real_answers(fake_genai, exam):
+    _write_results(exam, failed_q_no=3)
+
+    regraded = evaluation_system.regrade_batch(
+        "question.jpg", "key.jpg", exam.sheets_dir, exam.template_json, exam.output_dir,
+        failed=True, max_workers=8, ocr_engine=exam.ocr_engine
+    )
+
+    assert regraded == {f"student_{i}": [3] for i in range(8)}
+    summary = json.load(open(os.path.join(exam.output_dir, "summary.json")))
+    assert [result['total_score'] for result in summary] == ["7/7"] * 8
+    for result in summary:
+        detail = next(d for d in result['details'] if d['q_no'] == 3)
+        assert detail['student_answer'] == "A"
+        assert detail['reason_for_wrong'] == "N/A"
+        assert detail['confidence'] == 0.9
+    # Only the failed item was re-extracted and re-scored
+    assert fake_genai.instances[0].calls == 8 * 2
+
+
+def test_scoring_without_client_is_selected_as_failed(fake_genai, exam):
+    fake_genai.fail = True
+    evaluator = evaluation_system.AnswerSheetEvaluator(
+        "question.jpg", "key.jpg", exam.regions, ocr_engine=exam.ocr_engine)
+    evaluator.extract_question_and_key()
+
+    detail = evaluator.evaluate_question("student_0.jpg", 0)
+
+    assert detail['reason_for_wrong'] == SCORING_FAILED_REASON
+    result = evaluation_system.build_student_result("student_0", [detail], 1)
+    assert evaluation_system.select_regrade_items(result, failed=True) == [detail['q_no']]
+
+
+def test_flagged_answers_are_recorded_and_selected(fake_genai, exam):
+    client = evaluation_system.get_client()
+    client.score_response = {"score": 0, "reason": "Two options marked.", "confidence": 0.4, "flag_for_review": True}
+    evaluator = evaluation_system.AnswerSheetEvaluator(
+        "question.jpg", "key.jpg", exam.regions, ocr_engine=exam.ocr_engine)
+    evaluator.extract_question_and_key()
+
+    result = evaluator.evaluate_student_sheet("student_0.jpg", "student_0")
+
+    assert all(detail['flag_for_review'] for detail in result['details'])
+    assert evaluation_system.select_regrade_items(result, flagged=True) == [r['q_no'] for r in exam.regions]
+
+
+def test_regrade_skips_non_result_json_files(fake_genai, exam, caplog):
+    _write_results(exam, failed_q_no=1)
+    with open(os.path.join(exam.output_dir, "metrics.json"), 'w') as f:
+        json.dump({"queues": {}}, f)
+
+    regraded = evaluation_system.regrade_batch(
+        "question.jpg", "key.jpg", exam.sheets_dir, exam.template_json, exam.output_dir,
+        failed=True, ocr_engine=exam.ocr_engine
+    )
+
+    assert len(regraded) == 8
+    assert "Skipping metrics.json" in caplog.text
+
+
+def test_regrade_drops_questions_removed_from_template(fake_genai, exam):
+    _write_results(exam, failed_q_no=3)
+    # Drop Q7 from the template after the original run
+    template = json.load(open(exam.template_json))
+    template['regions'] = [region for region in template['regions'] if region['q_no'] != 7]
+    with open(exam.template_json, 'w') as f:
+        json.dump(template, f)
+
+    regraded = evaluation_system.regrade_batch(
+        "question.jpg", "key.jpg", exam.sheets_dir, exam.template_json, exam.output_dir,
+        failed=True, ocr_engine=exam.ocr_engine
+    )
+
+    assert regraded == {f"student_{i}": [3] for i in range(8)}
+    summary = json.load(open(os.path.join(exam.output_dir, "summary.json")))
+    assert [result['total_score'] for result in summary] == ["6/6"] * 8
+    for result in summary:
+        assert [d['q_no'] for d in result['details']] == [1, 2, 3, 4, 5, 6]
+
+
+def test_regrade_rewrites_results_with_removed_questions_without_api_calls(fake_genai, exam):
+    _write_results(exam, failed_q_no=None)
+    template = json.load(open(exam.template_json))
+    template['regions'] = template['regions'][:-1]
+    with open(exam.template_json, 'w') as f:
+        json.dump(template, f)
+
+    regraded = evaluation_system.regrade_batch(
+        "question.jpg", "key.jpg", exam.sheets_dir, exam.template_json, exam.output_dir,
+        failed=True, ocr_engine=exam.ocr_engine
+    )
+
+    assert regraded == {f"student_{i}": [] for i in range(8)}
+    assert fake_genai.instances == []
+    result = json.load(open(os.path.join(exam.output_dir, "student_0.json")))
+    assert result['total_score'] == "6/6"
+
+
+def test_regrade_falls_back_to_student_files_when_summary_is_malformed(fake_genai, exam, caplog):
+    _write_results(exam, failed_q_no=2)
+    with open(os.path.join(exam.output_dir, "summary.json"), 'w') as f:
+        f.write("[{\"student_id\": ")
+
+    regraded = evaluation_system.regrade_batch(
+        "question.jpg", "key.jpg", exam.sheets_dir, exam.template_json, exam.output_dir,
+        failed=True, ocr_engine=exam.ocr_engine
+    )
+
+    assert len(regraded) == 8
+    assert "Ignoring summary.json" in caplog.text
+    summary = json.load(open(os.path.join(exam.output_dir, "summary.json")))
+    assert [result['total_score'] for result in summary] == ["7/7"] * 8